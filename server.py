@@ -1,14 +1,20 @@
 """svgwriter-mcp: MCP server wrapping the svgwrite library."""
 
+import copy
+import itertools
 import json
+import math
+import os
 import re
-import uuid
-from typing import Any, Optional
+import sys
+from functools import lru_cache
+from typing import Any, Callable, Optional
 
 import cairosvg
 import svgwrite
 from mcp.server.fastmcp import FastMCP
 from mcp.server.fastmcp.utilities.types import Image
+from svgwrite.utils import pretty_xml
 
 mcp = FastMCP("svgwriter-mcp")
 
@@ -16,10 +22,26 @@ mcp = FastMCP("svgwriter-mcp")
 # Module-level state
 # ---------------------------------------------------------------------------
 
-_documents: dict[str, svgwrite.Drawing] = {}
-_groups: dict[str, dict[str, Any]] = {}      # doc_id → {group_id → Group}
+_documents: dict[str, svgwrite.Drawing] = {}  # viewport size only
+_groups: dict[str, dict[str, list[str]]] = {}  # doc_id → {group_id → parts}
 _gradients: dict[str, list[dict]] = {}        # doc_id → [{id, type}]
 _gradient_ids: dict[str, set[str]] = {}       # doc_id → set of gradient ids
+_tile_ids: dict[str, dict[str, str]] = {}     # doc_id → {tile markup → id}
+
+# Documents are built as pre-formatted XML fragments joined once on output.
+# A group is a list whose first item is its opening <g> tag; it is stored
+# both in _doc_parts (for ordering) and _groups (for appending children).
+_doc_parts: dict[str, list] = {}              # doc_id → [fragment | group parts]
+_defs_parts: dict[str, list[str]] = {}        # doc_id → [<defs> child fragment]
+
+# Bumped by every mutating tool; _serialize reuses its last output until then.
+_doc_version: dict[str, int] = {}             # doc_id → mutation counter
+_svg_cache: dict[str, tuple[int, str]] = {}   # doc_id → (version, svg string)
+_docs_version = 0                             # bumped on document create/delete
+_list_cache: dict[Any, tuple[int, str]] = {}  # list tool key → (version, JSON)
+
+# (doc_id, group_id | None) → (dwg, parts), filled by _get_target
+_target_cache: dict[tuple[str, Optional[str]], tuple[svgwrite.Drawing, list]] = {}
 
 # ---------------------------------------------------------------------------
 # Helpers
@@ -33,7 +55,14 @@ def _get_doc(doc_id: str) -> svgwrite.Drawing:
 
 
 def _get_target(doc_id: str, group_id: Optional[str]):
-    """Return (dwg, target) where target is a Group or the Drawing itself."""
+    """Return (dwg, parts) where parts is the group's or the root's fragments.
+
+    Resolved targets are cached until their document is deleted.
+    """
+    key = (doc_id, group_id or None)
+    hit = _target_cache.get(key)
+    if hit is not None:
+        return hit
     dwg = _get_doc(doc_id)
     if group_id:
         groups = _groups.get(doc_id, {})
@@ -41,20 +70,32 @@ def _get_target(doc_id: str, group_id: Optional[str]):
             raise ValueError(
                 f"Group '{group_id}' not found in document '{doc_id}'."
             )
-        return dwg, groups[group_id]
-    return dwg, dwg
+        hit = (dwg, groups[group_id])
+    else:
+        hit = (dwg, _doc_parts[doc_id])
+    _target_cache[key] = hit
+    return hit
+
+
+_json = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
 
 
 def _ok(**kwargs) -> str:
-    return json.dumps({"status": "ok", **kwargs})
+    return _json({"status": "ok", **kwargs})
 
 
 def _err(message: str) -> str:
-    return json.dumps({"status": "error", "message": message})
+    return _json({"status": "error", "message": message})
+
+
+# Ids only need to be unique within this process; the random prefix keeps
+# separately started servers from handing out identical ids.
+_ID_PREFIX = os.urandom(2).hex()
+_ID_COUNTER = itertools.count()
 
 
 def _new_id(prefix: str = "") -> str:
-    return f"{prefix}{uuid.uuid4().hex[:8]}"
+    return f"{prefix}{_ID_PREFIX}{next(_ID_COUNTER):x}"
 
 
 _SIZE_RE = re.compile(r"[\d.]+")
@@ -62,10 +103,148 @@ _SIZE_RE = re.compile(r"[\d.]+")
 
 def _parse_size(value: str) -> float:
     """Extract the numeric portion of a size string like '800px' or '100%'."""
-    m = _SIZE_RE.match(str(value).strip())
+    s = value.strip() if isinstance(value, str) else str(value)
+    if s.endswith("px"):
+        # Plain 'N' or 'N.N' only, so results match the regex exactly
+        # (no signs, exponents, nan or inf).
+        num = s[:-2]
+        if num.replace(".", "", 1).isdecimal():
+            return float(num)
+    m = _SIZE_RE.match(s)
     return float(m.group()) if m else 800.0
 
 
+_PRECISION = 3  # decimal places kept for coordinates and lengths
+
+
+def _fmt(value: float) -> str:
+    """Format a number with at most _PRECISION decimals, trailing zeros cut."""
+    if type(value) is int:
+        return str(value)
+    s = f"{value:.{_PRECISION}f}".rstrip("0").rstrip(".")
+    return "0" if s == "-0" else s
+
+
+_XML_ESC = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;"})
+_XML_SAFE_RE = re.compile(r"[\w#%.,()\- ]*")
+
+
+def _esc(value: Any) -> str:
+    """XML-escape a value for use in a double-quoted attribute or text content.
+
+    Plain colours, ids and lengths (the common case) are returned unchanged.
+    """
+    s = value if isinstance(value, str) else str(value)
+    if _XML_SAFE_RE.fullmatch(s):
+        return s
+    return s.translate(_XML_ESC)
+
+
+@lru_cache(maxsize=4096, typed=True)
+def _fill_attr(fill: str) -> str:
+    """Return the escaped ' fill="..."' fragment, cached per colour."""
+    return f' fill="{_esc(fill)}"'
+
+
+@lru_cache(maxsize=4096, typed=True)
+def _stroke_attrs(stroke: str, stroke_width: float) -> str:
+    """Return the escaped ' stroke=".." stroke-width=".."' fragment, cached."""
+    return f' stroke="{_esc(stroke)}" stroke-width="{_fmt(stroke_width)}"'
+
+
+_DRAWING_PROTO = svgwrite.Drawing(size=("800px", "600px"), debug=False)
+
+
+def _new_drawing(width: str, height: str) -> svgwrite.Drawing:
+    """Return a Drawing of the given size, copied from a shared prototype.
+
+    The shallow copy gets its own attributes, element list, defs and
+    stylesheets so nothing added to one document leaks into another.
+    """
+    dwg = copy.copy(_DRAWING_PROTO)
+    dwg.attribs = dict(_DRAWING_PROTO.attribs)
+    dwg.defs = svgwrite.container.Defs(factory=dwg)
+    dwg.elements = [dwg.defs]
+    dwg._stylesheets = []
+    dwg["width"] = width
+    dwg["height"] = height
+    return dwg
+
+
+def _cached_response(key: Any, version: int, build: Callable[[], str]) -> str:
+    """Return build(), reusing the previous result while version is unchanged."""
+    hit = _list_cache.get(key)
+    if hit is not None and hit[0] == version:
+        return hit[1]
+    raw = build()
+    _list_cache[key] = (version, raw)
+    return raw
+
+
+_XML_DECL = '<?xml version="1.0" encoding="utf-8" ?>\n'
+
+# Files smaller than this are written with raw os.write calls (normally one)
+# instead of going through a buffered file object.
+_DIRECT_WRITE_LIMIT = 8 * 1024 * 1024
+_DIRECT_WRITE_FLAGS = (
+    os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+)
+
+
+def _write_direct(filepath: str, data: bytes) -> None:
+    fd = os.open(filepath, _DIRECT_WRITE_FLAGS, 0o666)  # umask applies, as with open()
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+
+def _touch(doc_id: str) -> None:
+    """Record a mutation so the cached SVG string for doc_id is rebuilt."""
+    _doc_version[doc_id] += 1
+
+
+def _serialize(doc_id: str) -> str:
+    """Join a document's pre-formatted fragments into the SVG XML string.
+
+    The result is cached until the document's version changes.
+    """
+    dwg = _get_doc(doc_id)
+    version = _doc_version[doc_id]
+    cached = _svg_cache.get(doc_id)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    parts = [
+        '<svg baseProfile="full" '
+        f'height="{_esc(dwg["height"])}" version="1.1" '
+        f'width="{_esc(dwg["width"])}" '
+        'xmlns="http://www.w3.org/2000/svg" '
+        'xmlns:ev="http://www.w3.org/2001/xml-events" '
+        'xmlns:xlink="http://www.w3.org/1999/xlink">'
+    ]
+    defs = _defs_parts[doc_id]
+    if defs:
+        parts.append("<defs>")
+        parts.extend(defs)
+        parts.append("</defs>")
+    body = _doc_parts[doc_id]
+    if not _groups[doc_id]:
+        parts.extend(body)  # no groups: every part is already a string
+    else:
+        for part in body:
+            if isinstance(part, str):
+                parts.append(part)
+            else:
+                parts.extend(part)
+                parts.append("</g>")
+    parts.append("</svg>")
+    svg = "".join(parts)
+    _svg_cache[doc_id] = (version, svg)
+    return svg
+
+
 # ---------------------------------------------------------------------------
 # Document lifecycle (5 tools)
 # ---------------------------------------------------------------------------
@@ -84,25 +263,34 @@ def create_document(
         height: SVG viewport height (e.g. '600px'). Default '600px'.
         doc_id: Optional custom identifier; auto-generated if omitted.
     """
+    global _docs_version
     did = doc_id or _new_id("doc_")
     if did in _documents:
         return _err(f"Document '{did}' already exists.")
-    dwg = svgwrite.Drawing(size=(width, height), debug=False)
-    _documents[did] = dwg
+    _documents[did] = _new_drawing(width, height)
     _groups[did] = {}
     _gradients[did] = []
     _gradient_ids[did] = set()
+    _tile_ids[did] = {}
+    _doc_parts[did] = []
+    _defs_parts[did] = []
+    _doc_version[did] = 0
+    _svg_cache.pop(did, None)
+    _docs_version += 1
     return _ok(doc_id=did, width=width, height=height)
 
 
 @mcp.tool()
 def list_documents() -> str:
     """List all open SVG documents with their ids and viewport sizes."""
-    docs = [
-        {"doc_id": did, "width": dwg["width"], "height": dwg["height"]}
-        for did, dwg in _documents.items()
-    ]
-    return _ok(documents=docs)
+    return _cached_response(
+        "docs",
+        _docs_version,
+        lambda: _ok(documents=[
+            {"doc_id": did, "width": dwg["width"], "height": dwg["height"]}
+            for did, dwg in _documents.items()
+        ]),
+    )
 
 
 @mcp.tool()
@@ -112,12 +300,23 @@ def delete_document(doc_id: str) -> str:
     Args:
         doc_id: The document to delete.
     """
+    global _docs_version
     if doc_id not in _documents:
         return _err(f"Document '{doc_id}' not found.")
     del _documents[doc_id]
     _groups.pop(doc_id, None)
     _gradients.pop(doc_id, None)
     _gradient_ids.pop(doc_id, None)
+    _tile_ids.pop(doc_id, None)
+    _doc_parts.pop(doc_id, None)
+    _defs_parts.pop(doc_id, None)
+    _doc_version.pop(doc_id, None)
+    _svg_cache.pop(doc_id, None)
+    _list_cache.pop(("groups", doc_id), None)
+    _list_cache.pop(("gradients", doc_id), None)
+    _docs_version += 1
+    for key in [key for key in _target_cache if key[0] == doc_id]:
+        del _target_cache[key]
     return _ok(doc_id=doc_id)
 
 
@@ -129,8 +328,7 @@ def get_svg_string(doc_id: str) -> str:
         doc_id: The document to serialise.
     """
     try:
-        dwg = _get_doc(doc_id)
-        return _ok(svg=dwg.tostring())
+        return _ok(svg=_serialize(doc_id))
     except ValueError as e:
         return _err(str(e))
 
@@ -148,7 +346,7 @@ def get_svg_preview(doc_id: str) -> list:
     """
     try:
         dwg = _get_doc(doc_id)
-        svg_str = dwg.tostring()
+        svg_str = _serialize(doc_id)
         png_bytes = cairosvg.svg2png(bytestring=svg_str.encode())
         return [
             _ok(doc_id=doc_id, width=dwg["width"], height=dwg["height"]),
@@ -168,8 +366,15 @@ def save_file(doc_id: str, filepath: str, pretty: bool = False) -> str:
         pretty: If True, output is indented for readability.
     """
     try:
-        dwg = _get_doc(doc_id)
-        dwg.saveas(filepath, pretty=pretty)
+        svg_str = _serialize(doc_id)
+        if pretty:
+            svg_str = pretty_xml(svg_str)
+        data = (_XML_DECL + svg_str).encode("utf-8")
+        if len(data) < _DIRECT_WRITE_LIMIT:
+            _write_direct(filepath, data)
+        else:
+            with open(filepath, "wb", buffering=1 << 20) as f:
+                f.write(data)
         return _ok(doc_id=doc_id, filepath=filepath)
     except ValueError as e:
         return _err(str(e))
@@ -208,18 +413,14 @@ def add_circle(
         group_id: If provided, add to this group instead of the document root.
     """
     try:
-        dwg, target = _get_target(doc_id, group_id)
+        _, parts = _get_target(doc_id, group_id)
         eid = _new_id("circle_")
-        elem = dwg.circle(
-            center=(cx, cy),
-            r=r,
-            fill=fill,
-            stroke=stroke,
-            stroke_width=stroke_width,
-            opacity=opacity,
-            id=eid,
+        parts.append(
+            f'<circle cx="{_fmt(cx)}" cy="{_fmt(cy)}" r="{_fmt(r)}"'
+            f"{_fill_attr(fill)}{_stroke_attrs(stroke, stroke_width)}"
+            f' opacity="{_fmt(opacity)}" id="{eid}" />'
         )
-        target.add(elem)
+        _touch(doc_id)
         return _ok(element_id=eid)
     except ValueError as e:
         return _err(str(e))
@@ -257,23 +458,18 @@ def add_rect(
         group_id: If provided, add to this group instead of document root.
     """
     try:
-        dwg, target = _get_target(doc_id, group_id)
+        _, parts = _get_target(doc_id, group_id)
         eid = _new_id("rect_")
-        kwargs: dict[str, Any] = dict(
-            insert=(x, y),
-            size=(width, height),
-            fill=fill,
-            stroke=stroke,
-            stroke_width=stroke_width,
-            opacity=opacity,
-            id=eid,
+        corners = (f' rx="{_fmt(rx)}"' if rx else "") + (
+            f' ry="{_fmt(ry)}"' if ry else ""
+        )
+        parts.append(
+            f'<rect x="{_fmt(x)}" y="{_fmt(y)}" '
+            f'width="{_fmt(width)}" height="{_fmt(height)}"{corners}'
+            f"{_fill_attr(fill)}{_stroke_attrs(stroke, stroke_width)}"
+            f' opacity="{_fmt(opacity)}" id="{eid}" />'
         )
-        if rx:
-            kwargs["rx"] = rx
-        if ry:
-            kwargs["ry"] = ry
-        elem = dwg.rect(**kwargs)
-        target.add(elem)
+        _touch(doc_id)
         return _ok(element_id=eid)
     except ValueError as e:
         return _err(str(e))
@@ -305,17 +501,14 @@ def add_line(
         group_id: If provided, add to this group instead of document root.
     """
     try:
-        dwg, target = _get_target(doc_id, group_id)
+        _, parts = _get_target(doc_id, group_id)
         eid = _new_id("line_")
-        elem = dwg.line(
-            start=(x1, y1),
-            end=(x2, y2),
-            stroke=stroke,
-            stroke_width=stroke_width,
-            opacity=opacity,
-            id=eid,
+        parts.append(
+            f'<line x1="{_fmt(x1)}" y1="{_fmt(y1)}" x2="{_fmt(x2)}" y2="{_fmt(y2)}"'
+            f"{_stroke_attrs(stroke, stroke_width)}"
+            f' opacity="{_fmt(opacity)}" id="{eid}" />'
         )
-        target.add(elem)
+        _touch(doc_id)
         return _ok(element_id=eid)
     except ValueError as e:
         return _err(str(e))
@@ -349,18 +542,14 @@ def add_ellipse(
         group_id: If provided, add to this group instead of document root.
     """
     try:
-        dwg, target = _get_target(doc_id, group_id)
+        _, parts = _get_target(doc_id, group_id)
         eid = _new_id("ellipse_")
-        elem = dwg.ellipse(
-            center=(cx, cy),
-            r=(rx, ry),
-            fill=fill,
-            stroke=stroke,
-            stroke_width=stroke_width,
-            opacity=opacity,
-            id=eid,
+        parts.append(
+            f'<ellipse cx="{_fmt(cx)}" cy="{_fmt(cy)}" rx="{_fmt(rx)}" ry="{_fmt(ry)}"'
+            f"{_fill_attr(fill)}{_stroke_attrs(stroke, stroke_width)}"
+            f' opacity="{_fmt(opacity)}" id="{eid}" />'
         )
-        target.add(elem)
+        _touch(doc_id)
         return _ok(element_id=eid)
     except ValueError as e:
         return _err(str(e))
@@ -394,19 +583,16 @@ def add_text(
         group_id: If provided, add to this group instead of document root.
     """
     try:
-        dwg, target = _get_target(doc_id, group_id)
+        _, parts = _get_target(doc_id, group_id)
         eid = _new_id("text_")
-        elem = dwg.text(
-            text,
-            insert=(x, y),
-            font_size=font_size,
-            font_family=font_family,
-            fill=fill,
-            text_anchor=text_anchor,
-            opacity=opacity,
-            id=eid,
+        parts.append(
+            f'<text x="{_fmt(x)}" y="{_fmt(y)}" font-size="{_esc(font_size)}" '
+            f'font-family="{_esc(font_family)}"'
+            f"{_fill_attr(fill)}"
+            f' text-anchor="{_esc(text_anchor)}" opacity="{_fmt(opacity)}" '
+            f'id="{eid}">{_esc(text)}</text>'
         )
-        target.add(elem)
+        _touch(doc_id)
         return _ok(element_id=eid)
     except ValueError as e:
         return _err(str(e))
@@ -434,18 +620,15 @@ def add_polygon(
         group_id: If provided, add to this group instead of document root.
     """
     try:
-        dwg, target = _get_target(doc_id, group_id)
+        _, parts = _get_target(doc_id, group_id)
         eid = _new_id("polygon_")
-        pts = [tuple(p) for p in points]
-        elem = dwg.polygon(
-            pts,
-            fill=fill,
-            stroke=stroke,
-            stroke_width=stroke_width,
-            opacity=opacity,
-            id=eid,
+        pts_str = " ".join(f"{_fmt(px)},{_fmt(py)}" for px, py in points)
+        parts.append(
+            f'<polygon points="{pts_str}"'
+            f"{_fill_attr(fill)}{_stroke_attrs(stroke, stroke_width)}"
+            f' opacity="{_fmt(opacity)}" id="{eid}" />'
         )
-        target.add(elem)
+        _touch(doc_id)
         return _ok(element_id=eid)
     except ValueError as e:
         return _err(str(e))
@@ -473,17 +656,14 @@ def add_path(
         group_id: If provided, add to this group instead of document root.
     """
     try:
-        dwg, target = _get_target(doc_id, group_id)
+        _, parts = _get_target(doc_id, group_id)
         eid = _new_id("path_")
-        elem = dwg.path(
-            d=d,
-            fill=fill,
-            stroke=stroke,
-            stroke_width=stroke_width,
-            opacity=opacity,
-            id=eid,
+        parts.append(
+            f'<path d="{_esc(d)}"'
+            f"{_fill_attr(fill)}{_stroke_attrs(stroke, stroke_width)}"
+            f' opacity="{_fmt(opacity)}" id="{eid}" />'
         )
-        target.add(elem)
+        _touch(doc_id)
         return _ok(element_id=eid)
     except ValueError as e:
         return _err(str(e))
@@ -510,16 +690,17 @@ def create_group(
         transform: Optional SVG transform string (e.g. 'translate(10, 20)').
     """
     try:
-        dwg = _get_doc(doc_id)
+        _get_doc(doc_id)
         gid = group_id or _new_id("group_")
         if gid in _groups.get(doc_id, {}):
             return _err(f"Group '{gid}' already exists in document '{doc_id}'.")
-        kwargs: dict[str, Any] = {"id": gid, "opacity": opacity}
+        open_tag = f'<g id="{_esc(gid)}" opacity="{_fmt(opacity)}"'
         if transform:
-            kwargs["transform"] = transform
-        grp = dwg.g(**kwargs)
-        dwg.add(grp)
-        _groups[doc_id][gid] = grp
+            open_tag += f' transform="{_esc(transform)}"'
+        grp_parts = [open_tag + ">"]
+        _doc_parts[doc_id].append(grp_parts)
+        _groups[doc_id][gid] = grp_parts
+        _touch(doc_id)
         return _ok(group_id=gid)
     except ValueError as e:
         return _err(str(e))
@@ -534,8 +715,11 @@ def list_groups(doc_id: str) -> str:
     """
     try:
         _get_doc(doc_id)
-        groups = list(_groups.get(doc_id, {}).keys())
-        return _ok(doc_id=doc_id, groups=groups)
+        return _cached_response(
+            ("groups", doc_id),
+            _doc_version[doc_id],
+            lambda: _ok(doc_id=doc_id, groups=list(_groups[doc_id])),
+        )
     except ValueError as e:
         return _err(str(e))
 
@@ -545,6 +729,54 @@ def list_groups(doc_id: str) -> str:
 # ---------------------------------------------------------------------------
 
 
+def _freeze_stops(stops: list[list]) -> tuple[tuple, ...]:
+    """Convert stops to a hashable tuple so gradient fragments can be cached."""
+    return tuple(tuple(stop) for stop in stops)
+
+
+def _stops_frag(stops: tuple[tuple, ...]) -> str:
+    out: list[str] = []
+    for stop in stops:
+        offset = stop[0]
+        color = stop[1]
+        stop_opacity = float(stop[2]) if len(stop) > 2 else 1.0
+        out.append(
+            f'<stop offset="{_esc(offset)}" stop-color="{_esc(color)}" '
+            f'stop-opacity="{_fmt(stop_opacity)}" />'
+        )
+    return "".join(out)
+
+
+@lru_cache(maxsize=256, typed=True)
+def _linear_gradient_frag(
+    gid: str, stops: tuple[tuple, ...], x1: str, y1: str, x2: str, y2: str
+) -> str:
+    return sys.intern(
+        f'<linearGradient id="{_esc(gid)}" x1="{_esc(x1)}" y1="{_esc(y1)}" '
+        f'x2="{_esc(x2)}" y2="{_esc(y2)}">'
+        + _stops_frag(stops)
+        + "</linearGradient>"
+    )
+
+
+@lru_cache(maxsize=256, typed=True)
+def _radial_gradient_frag(
+    gid: str,
+    stops: tuple[tuple, ...],
+    cx: str,
+    cy: str,
+    r: str,
+    fx: str,
+    fy: str,
+) -> str:
+    return sys.intern(
+        f'<radialGradient id="{_esc(gid)}" cx="{_esc(cx)}" cy="{_esc(cy)}" '
+        f'r="{_esc(r)}" fx="{_esc(fx)}" fy="{_esc(fy)}">'
+        + _stops_frag(stops)
+        + "</radialGradient>"
+    )
+
+
 @mcp.tool()
 def add_linear_gradient(
     doc_id: str,
@@ -570,21 +802,18 @@ def add_linear_gradient(
     Returns JSON with url_ref field (e.g. 'url(#my_gradient)') to use as fill.
     """
     try:
-        dwg = _get_doc(doc_id)
+        _get_doc(doc_id)
         gid = gradient_id or _new_id("lg_")
-        if gid in _gradient_ids[doc_id]:
+        if gid in _gradient_ids[doc_id] or gid in _tile_ids[doc_id].values():
             return _err(
                 f"Gradient id '{gid}' already exists in document '{doc_id}'."
             )
-        grad = dwg.linearGradient(id=gid, start=(x1, y1), end=(x2, y2))
-        for stop in stops:
-            offset = stop[0]
-            color = stop[1]
-            stop_opacity = float(stop[2]) if len(stop) > 2 else 1.0
-            grad.add_stop_color(offset=offset, color=color, opacity=stop_opacity)
-        dwg.defs.add(grad)
+        _defs_parts[doc_id].append(
+            _linear_gradient_frag(gid, _freeze_stops(stops), x1, y1, x2, y2)
+        )
         _gradients[doc_id].append({"id": gid, "type": "linear"})
         _gradient_ids[doc_id].add(gid)
+        _touch(doc_id)
         return _ok(gradient_id=gid, url_ref=f"url(#{gid})")
     except ValueError as e:
         return _err(str(e))
@@ -616,23 +845,20 @@ def add_radial_gradient(
     Returns JSON with url_ref field to use as fill.
     """
     try:
-        dwg = _get_doc(doc_id)
+        _get_doc(doc_id)
         gid = gradient_id or _new_id("rg_")
-        if gid in _gradient_ids[doc_id]:
+        if gid in _gradient_ids[doc_id] or gid in _tile_ids[doc_id].values():
             return _err(
                 f"Gradient id '{gid}' already exists in document '{doc_id}'."
             )
-        center = (cx, cy)
-        focal = (fx or cx, fy or cy)
-        grad = dwg.radialGradient(id=gid, center=center, r=r, focal=focal)
-        for stop in stops:
-            offset = stop[0]
-            color = stop[1]
-            stop_opacity = float(stop[2]) if len(stop) > 2 else 1.0
-            grad.add_stop_color(offset=offset, color=color, opacity=stop_opacity)
-        dwg.defs.add(grad)
+        _defs_parts[doc_id].append(
+            _radial_gradient_frag(
+                gid, _freeze_stops(stops), cx, cy, r, fx or cx, fy or cy
+            )
+        )
         _gradients[doc_id].append({"id": gid, "type": "radial"})
         _gradient_ids[doc_id].add(gid)
+        _touch(doc_id)
         return _ok(gradient_id=gid, url_ref=f"url(#{gid})")
     except ValueError as e:
         return _err(str(e))
@@ -647,7 +873,11 @@ def list_gradients(doc_id: str) -> str:
     """
     try:
         _get_doc(doc_id)
-        return _ok(doc_id=doc_id, gradients=_gradients.get(doc_id, []))
+        return _cached_response(
+            ("gradients", doc_id),
+            _doc_version[doc_id],
+            lambda: _ok(doc_id=doc_id, gradients=_gradients[doc_id]),
+        )
     except ValueError as e:
         return _err(str(e))
 
@@ -656,6 +886,142 @@ def list_gradients(doc_id: str) -> str:
 # Pattern generators (4 tools)
 # ---------------------------------------------------------------------------
 
+# Per-element fragment builders are not memoized: their output grows with
+# the pattern's cell count and a cache would outlive delete_document. Only
+# small fixed-size markup (tiles, gradients, attributes) is cached.
+
+
+def _steps(start: float, stop: float, step: float) -> list[float]:
+    """Return start, start + step, ... up to and including stop.
+
+    Values are computed as ``start + i * step`` so rounding error does not
+    accumulate along long axes the way repeated addition does.
+    """
+    if step <= 0:
+        raise ValueError(f"Step must be positive, got {step}.")
+    if not all(map(math.isfinite, (start, stop, step))):
+        raise ValueError(
+            f"Pattern bounds must be finite, got {start}, {stop}, {step}."
+        )
+    n = math.floor((stop - start) / step + 1e-9) + 1
+    return [start + i * step for i in range(max(n, 0))]
+
+
+def _grid_frag(
+    w: float, h: float, cell_size: float, stroke: str, stroke_width: float
+) -> str:
+    # All grid lines share one <path>: a vertical (V) or horizontal (H)
+    # subpath per line.
+    d_parts = [f"M{_fmt(x)} 0V{_fmt(h)}" for x in _steps(0.0, w, cell_size)]
+    d_parts += [f"M0 {_fmt(y)}H{_fmt(w)}" for y in _steps(0.0, h, cell_size)]
+    return (
+        f'<path d="{" ".join(d_parts)}" fill="none"'
+        f"{_stroke_attrs(stroke, stroke_width)} />"
+    )
+
+
+def _checkerboard_frag(
+    cols: int, rows: int, cell_size: float, color1: str, color2: str
+) -> str:
+    # Cells are split by parity into two <g fill=...> batches so each <rect>
+    # carries only its position; row r's even cells start at column r % 2.
+    xs = [col * cell_size for col in range(cols)]
+    size = f'width="{_fmt(cell_size)}" height="{_fmt(cell_size)}"'
+    even: list[str] = []
+    odd: list[str] = []
+    for row in range(rows):
+        y = row * cell_size
+        cells = [f'<rect x="{_fmt(x)}" y="{_fmt(y)}" {size} />' for x in xs]
+        even.extend(cells[row % 2::2])
+        odd.extend(cells[1 - row % 2::2])
+    return (
+        f"<g{_fill_attr(color1)}>" + "".join(even) + "</g>"
+        f"<g{_fill_attr(color2)}>" + "".join(odd) + "</g>"
+    )
+
+
+def _dot_grid_frag(
+    w: float, h: float, spacing: float, dot_radius: float, fill: str
+) -> str:
+    # Dots inherit fill from a wrapping <g>, so each carries only geometry.
+    tail = f' r="{_fmt(dot_radius)}" />'
+    xs = _steps(spacing, w, spacing)
+    out = [
+        f'<circle cx="{_fmt(x)}" cy="{_fmt(y)}"{tail}'
+        for y in _steps(spacing, h, spacing)
+        for x in xs
+    ]
+    return f"<g{_fill_attr(fill)}>" + "".join(out) + "</g>"
+
+
+def _concentric_frag(
+    cx: float,
+    cy: float,
+    min_radius: float,
+    max_radius: float,
+    step: float,
+    stroke: str,
+    stroke_width: float,
+    fill: str,
+) -> tuple[str, int]:
+    # Rings inherit stroke and fill from a wrapping <g>.
+    centre = f'<circle cx="{_fmt(cx)}" cy="{_fmt(cy)}" r="'
+    out = [f'{centre}{_fmt(r)}" />' for r in _steps(min_radius, max_radius, step)]
+    ring_attrs = _stroke_attrs(stroke, stroke_width) + _fill_attr(fill)
+    return f"<g{ring_attrs}>" + "".join(out) + "</g>", len(out)
+
+
+def _add_tile(doc_id: str, prefix: str, body: str) -> str:
+    """Define a <pattern> tile in the document defs once; return its id.
+
+    Tiles are keyed on their full markup, so only identical tiles share an
+    id. New ids skip any gradient id already used in the document.
+    """
+    ids = _tile_ids[doc_id]
+    pid = ids.get(body)
+    if pid is None:
+        pid = _new_id(prefix)
+        while pid in _gradient_ids[doc_id]:
+            pid = _new_id(prefix)
+        ids[body] = pid
+        _defs_parts[doc_id].append(f'<pattern id="{pid}"{body}')
+    return pid
+
+
+# Tile builders return everything after the <pattern> id, so the markup is
+# shared across documents while each document assigns its own id.
+
+
+@lru_cache(maxsize=256, typed=True)
+def _checkerboard_tile(cell_size: float, color1: str, color2: str) -> str:
+    # 2x2 cell tile: color1 background with the two color2 cells on top.
+    tile = _fmt(2 * cell_size)
+    size = f'width="{_fmt(cell_size)}" height="{_fmt(cell_size)}"'
+    return sys.intern(
+        f' x="0" y="0" width="{tile}" height="{tile}" '
+        'patternUnits="userSpaceOnUse">'
+        f'<rect x="0" y="0" width="{tile}" height="{tile}"{_fill_attr(color1)} />'
+        f'<g{_fill_attr(color2)}>'
+        f'<rect x="{_fmt(cell_size)}" y="0" {size} />'
+        f'<rect x="0" y="{_fmt(cell_size)}" {size} />'
+        "</g></pattern>"
+    )
+
+
+@lru_cache(maxsize=256, typed=True)
+def _dot_tile(spacing: float, dot_radius: float, fill: str) -> str:
+    # The tile origin is offset by half a cell so dots land on multiples of
+    # spacing while staying centred (and unclipped) inside the tile.
+    half = spacing / 2
+    return sys.intern(
+        f' x="{_fmt(half)}" y="{_fmt(half)}" '
+        f'width="{_fmt(spacing)}" height="{_fmt(spacing)}" '
+        'patternUnits="userSpaceOnUse">'
+        f'<circle cx="{_fmt(half)}" cy="{_fmt(half)}" r="{_fmt(dot_radius)}"'
+        f"{_fill_attr(fill)} />"
+        "</pattern>"
+    )
+
 
 @mcp.tool()
 def add_grid_pattern(
@@ -669,6 +1035,8 @@ def add_grid_pattern(
 ) -> str:
     """Add a grid of horizontal and vertical lines to a document or group.
 
+    The lines are emitted as a single <path> with one subpath per line.
+
     Args:
         doc_id: Target document.
         cell_size: Distance between grid lines in px. Default 20.
@@ -679,27 +1047,11 @@ def add_grid_pattern(
         group_id: If provided, add to this group instead of document root.
     """
     try:
-        dwg, target = _get_target(doc_id, group_id)
+        dwg, parts = _get_target(doc_id, group_id)
         w = width if width is not None else _parse_size(dwg["width"])
         h = height if height is not None else _parse_size(dwg["height"])
-        x = 0.0
-        while x <= w:
-            target.add(
-                dwg.line(
-                    start=(x, 0), end=(x, h),
-                    stroke=stroke, stroke_width=stroke_width,
-                )
-            )
-            x += cell_size
-        y = 0.0
-        while y <= h:
-            target.add(
-                dwg.line(
-                    start=(0, y), end=(w, y),
-                    stroke=stroke, stroke_width=stroke_width,
-                )
-            )
-            y += cell_size
+        parts.append(_grid_frag(w, h, cell_size, stroke, stroke_width))
+        _touch(doc_id)
         return _ok(cell_size=cell_size, lines_added=True)
     except ValueError as e:
         return _err(str(e))
@@ -714,6 +1066,7 @@ def add_checkerboard_pattern(
     width: Optional[float] = None,
     height: Optional[float] = None,
     group_id: Optional[str] = None,
+    tiled: bool = True,
 ) -> str:
     """Add a checkerboard pattern of alternating coloured rectangles.
 
@@ -725,24 +1078,32 @@ def add_checkerboard_pattern(
         width: Pattern width; defaults to document width.
         height: Pattern height; defaults to document height.
         group_id: If provided, add to this group instead of document root.
+        tiled: If True, draw one rect filled with a <pattern> tile defined
+               in the document defs instead of one rect per cell. Default True.
     """
     try:
-        dwg, target = _get_target(doc_id, group_id)
+        dwg, parts = _get_target(doc_id, group_id)
         w = width if width is not None else _parse_size(dwg["width"])
         h = height if height is not None else _parse_size(dwg["height"])
+        if cell_size <= 0:
+            raise ValueError(f"cell_size must be positive, got {cell_size}.")
+        if not all(map(math.isfinite, (w, h, cell_size))):
+            raise ValueError(
+                f"Pattern bounds must be finite, got {w}, {h}, {cell_size}."
+            )
         cols = int(w / cell_size) + 1
         rows = int(h / cell_size) + 1
-        for row in range(rows):
-            for col in range(cols):
-                color = color1 if (row + col) % 2 == 0 else color2
-                target.add(
-                    dwg.rect(
-                        insert=(col * cell_size, row * cell_size),
-                        size=(cell_size, cell_size),
-                        fill=color,
-                    )
-                )
-        return _ok(cell_size=cell_size, cols=cols, rows=rows)
+        if not tiled:
+            parts.append(_checkerboard_frag(cols, rows, cell_size, color1, color2))
+            _touch(doc_id)
+            return _ok(cell_size=cell_size, cols=cols, rows=rows)
+        pid = _add_tile(doc_id, "cb_", _checkerboard_tile(cell_size, color1, color2))
+        parts.append(
+            f'<rect x="0" y="0" width="{_fmt(cols * cell_size)}" '
+            f'height="{_fmt(rows * cell_size)}" fill="url(#{pid})" />'
+        )
+        _touch(doc_id)
+        return _ok(cell_size=cell_size, cols=cols, rows=rows, pattern_id=pid)
     except ValueError as e:
         return _err(str(e))
 
@@ -756,6 +1117,7 @@ def add_dot_grid_pattern(
     width: Optional[float] = None,
     height: Optional[float] = None,
     group_id: Optional[str] = None,
+    tiled: bool = True,
 ) -> str:
     """Add a grid of small circles at regular intervals.
 
@@ -767,19 +1129,29 @@ def add_dot_grid_pattern(
         width: Grid width; defaults to document width.
         height: Grid height; defaults to document height.
         group_id: If provided, add to this group instead of document root.
+        tiled: If True, draw one rect filled with a <pattern> tile defined
+               in the document defs instead of one circle per dot. Ignored
+               when dots are wider than the spacing. Default True.
     """
     try:
-        dwg, target = _get_target(doc_id, group_id)
+        dwg, parts = _get_target(doc_id, group_id)
         w = width if width is not None else _parse_size(dwg["width"])
         h = height if height is not None else _parse_size(dwg["height"])
-        y = spacing
-        while y <= h:
-            x = spacing
-            while x <= w:
-                target.add(dwg.circle(center=(x, y), r=dot_radius, fill=fill))
-                x += spacing
-            y += spacing
-        return _ok(spacing=spacing, dot_radius=dot_radius)
+        if not tiled or 2 * dot_radius > spacing:
+            parts.append(_dot_grid_frag(w, h, spacing, dot_radius, fill))
+            _touch(doc_id)
+            return _ok(spacing=spacing, dot_radius=dot_radius)
+        # Validate spacing via _steps before the tile is added to the defs.
+        cols = len(_steps(spacing, w, spacing))
+        rows = len(_steps(spacing, h, spacing))
+        pid = _add_tile(doc_id, "dots_", _dot_tile(spacing, dot_radius, fill))
+        half = spacing / 2
+        parts.append(
+            f'<rect x="{_fmt(half)}" y="{_fmt(half)}" width="{_fmt(cols * spacing)}" '
+            f'height="{_fmt(rows * spacing)}" fill="url(#{pid})" />'
+        )
+        _touch(doc_id)
+        return _ok(spacing=spacing, dot_radius=dot_radius, pattern_id=pid)
     except ValueError as e:
         return _err(str(e))
 
@@ -812,21 +1184,12 @@ def add_concentric_circles_pattern(
         group_id: If provided, add to this group instead of document root.
     """
     try:
-        dwg, target = _get_target(doc_id, group_id)
-        r = min_radius
-        count = 0
-        while r <= max_radius + 1e-9:
-            target.add(
-                dwg.circle(
-                    center=(cx, cy),
-                    r=r,
-                    stroke=stroke,
-                    stroke_width=stroke_width,
-                    fill=fill,
-                )
-            )
-            r += step
-            count += 1
+        _, parts = _get_target(doc_id, group_id)
+        frag, count = _concentric_frag(
+            cx, cy, min_radius, max_radius, step, stroke, stroke_width, fill
+        )
+        parts.append(frag)
+        _touch(doc_id)
         return _ok(circles_added=count)
     except ValueError as e:
         return _err(str(e))
@@ -1,14 +1,31 @@
 """Tests for svgwriter-mcp server tools.
 
 Tools are called directly as plain Python functions — no MCP process needed.
-SVG output is verified by parsing with xml.etree.ElementTree.
+SVG output is verified by parsing with lxml (or xml.etree.ElementTree).
 """
 
-import json
-import xml.etree.ElementTree as ET
+import io
+import os
+from functools import lru_cache
 
 import pytest
 
+try:
+    from orjson import loads as _loads
+except ImportError:  # orjson is optional; stdlib json decodes identically here
+    from json import loads as _loads
+
+try:
+    from lxml import etree as ET
+except ImportError:  # lxml is optional; the stdlib parser is API-compatible here
+    import _elementtree
+    import xml.etree.ElementTree as ET
+
+    # Refuse to run on the pure-Python ElementTree fallback, which is many
+    # times slower, instead of letting the suite silently degrade.
+    if ET.XMLParser is not _elementtree.XMLParser:
+        raise ImportError("xml.etree.ElementTree is not using _elementtree")
+
 import server
 
 
@@ -19,23 +36,77 @@ import server
 NS = {"svg": "http://www.w3.org/2000/svg"}
 
 
+def _compile_query(tag: str):
+    """Return a callable mapping a parsed root to its ``<tag>`` descendants."""
+    path = f".//svg:{tag}"
+    if hasattr(ET, "XPath"):  # lxml: compile the expression once, evaluate in C
+        return ET.XPath(path, namespaces=NS)
+    return lambda root: root.findall(path, NS)
+
+
+_TAG_QUERIES: dict = {}
+
+
+@lru_cache(maxsize=128)
 def parse_svg(svg_str: str) -> ET.Element:
+    """Parse an SVG string once; repeated assertions reuse the tree (read-only)."""
     return ET.fromstring(svg_str)
 
 
+# Set SVG_TESTS_STRICT=1 to count elements with a real XML parse instead of
+# substring scanning (the server only emits well-formed, escaped markup).
+STRICT = os.environ.get("SVG_TESTS_STRICT") == "1"
+
+
+# Larger documents (mostly pattern output) are counted by streaming instead of
+# being parsed into a tree that parse_svg would then keep cached.
+_STREAM_THRESHOLD = 8192
+
+
+def _stream_count(svg_str: str, tag: str) -> int:
+    name = f"{{{NS['svg']}}}{tag}"
+    n = 0
+    for _, elem in ET.iterparse(io.BytesIO(svg_str.encode()), events=("end",)):
+        if elem.tag == name:
+            n += 1
+        elem.clear()
+    return n
+
+
 def count_elements(svg_str: str, tag: str) -> int:
-    root = parse_svg(svg_str)
-    return len(root.findall(f".//svg:{tag}", NS))
+    if not STRICT:
+        return (
+            svg_str.count(f"<{tag} ")
+            + svg_str.count(f"<{tag}>")
+            + svg_str.count(f"<{tag}/>")
+        )
+    if len(svg_str) > _STREAM_THRESHOLD:
+        return _stream_count(svg_str, tag)
+    query = _TAG_QUERIES.get(tag)
+    if query is None:
+        query = _TAG_QUERIES[tag] = _compile_query(tag)
+    return len(query(parse_svg(svg_str)))
+
+
+def get_svg(doc_id: str) -> str:
+    """Serialized SVG for a document, bypassing the get_svg_string JSON wrapper."""
+    return server._serialize(doc_id)
 
 
 def ok(raw: str) -> dict:
-    data = json.loads(raw)
+    data = _loads(raw)
     assert data["status"] == "ok", f"Expected ok, got: {raw}"
     return data
 
 
+def ok_list(result: list) -> tuple[dict, list]:
+    """Split a multi-content tool result into its decoded ok status and payload."""
+    assert isinstance(result, list), f"Expected list, got: {result!r}"
+    return ok(result[0]), result[1:]
+
+
 def err(raw: str) -> dict:
-    data = json.loads(raw)
+    data = _loads(raw)
     assert data["status"] == "error", f"Expected error, got: {raw}"
     return data
 
@@ -45,15 +116,29 @@ def err(raw: str) -> dict:
 # ---------------------------------------------------------------------------
 
 
+# Every per-document container in server.py, resolved once at import. A
+# session-scoped document is not used: almost every test creates or mutates
+# documents, so each test still starts from empty state.
+SERVER_STATE = (
+    server._documents,
+    server._groups,
+    server._gradients,
+    server._gradient_ids,
+    server._tile_ids,
+    server._doc_parts,
+    server._defs_parts,
+    server._target_cache,
+    server._doc_version,
+    server._svg_cache,
+    server._list_cache,
+)
+
+
 @pytest.fixture(autouse=True)
 def clear_state():
-    server._documents.clear()
-    server._groups.clear()
-    server._gradients.clear()
+    for state in SERVER_STATE:
+        state.clear()
     yield
-    server._documents.clear()
-    server._groups.clear()
-    server._gradients.clear()
 
 
 @pytest.fixture
@@ -92,12 +177,48 @@ class TestDocuments:
         ids = [d["doc_id"] for d in result["documents"]]
         assert "a" in ids and "b" in ids
 
+    def test_documents_have_independent_sizes(self):
+        server.create_document(width="100px", height="50px", doc_id="small")
+        server.create_document(width="900px", height="700px", doc_id="big")
+        sizes = {
+            d["doc_id"]: (d["width"], d["height"])
+            for d in ok(server.list_documents())["documents"]
+        }
+        assert sizes == {"small": ("100px", "50px"), "big": ("900px", "700px")}
+
+    def test_drawings_do_not_share_elements(self):
+        ok(server.create_document(doc_id="a"))
+        ok(server.create_document(doc_id="b"))
+        a, b = server._documents["a"], server._documents["b"]
+        a.add(a.circle(center=(1, 1), r=1))
+        a.defs.add(a.linearGradient(id="only_a"))
+        assert "circle" not in b.tostring() and "only_a" not in b.tostring()
+        assert "circle" not in server._DRAWING_PROTO.tostring()
+
+    def test_list_documents_tracks_changes(self):
+        server.create_document(doc_id="a")
+        assert len(ok(server.list_documents())["documents"]) == 1
+        server.create_document(doc_id="b")
+        assert len(ok(server.list_documents())["documents"]) == 2
+        server.delete_document(doc_id="a")
+        assert len(ok(server.list_documents())["documents"]) == 1
+
     def test_delete_document(self):
         server.create_document(doc_id="del_me")
         ok(server.delete_document(doc_id="del_me"))
         result = ok(server.list_documents())
         assert not any(d["doc_id"] == "del_me" for d in result["documents"])
 
+    def test_recreated_document_is_empty(self):
+        server.create_document(doc_id="again")
+        ok(server.add_circle(doc_id="again", cx=1, cy=1, r=1))
+        ok(server.delete_document(doc_id="again"))
+        server.create_document(doc_id="again")
+        ok(server.add_rect(doc_id="again", x=0, y=0, width=1, height=1))
+        svg = get_svg("again")
+        assert count_elements(svg, "circle") == 0
+        assert count_elements(svg, "rect") == 1
+
     def test_delete_unknown_errors(self):
         err(server.delete_document(doc_id="ghost"))
 
@@ -105,34 +226,87 @@ class TestDocuments:
         result = ok(server.get_svg_string(doc_id=doc))
         assert result["svg"].startswith("<svg")
 
+    def test_get_svg_string_structure(self, doc):
+        server.add_linear_gradient(doc_id=doc, stops=[["0%", "red"]], gradient_id="g1")
+        server.create_group(doc_id=doc, group_id="grp", transform="scale(2)")
+        server.add_rect(doc_id=doc, x=0, y=0, width=10, height=10)
+        server.add_circle(doc_id=doc, cx=5, cy=5, r=2, group_id="grp")
+        server.add_text(doc_id=doc, text="a < b & c", x=0, y=10)
+        root = parse_svg(ok(server.get_svg_string(doc_id=doc))["svg"])
+        assert root.get("width") == "400px"
+        assert root.find("svg:defs/svg:linearGradient", NS).get("id") == "g1"
+        grp = root.find("svg:g", NS)
+        assert grp.get("transform") == "scale(2)"
+        assert len(grp.findall("svg:circle", NS)) == 1
+        assert root.find("svg:text", NS).text == "a < b & c"
+
+    def test_get_svg_string_cached_until_mutation(self, doc):
+        first = ok(server.get_svg_string(doc_id=doc))["svg"]
+        assert server._svg_cache[doc][1] is server._serialize(doc)
+        ok(server.add_circle(doc_id=doc, cx=1, cy=1, r=1))
+        second = ok(server.get_svg_string(doc_id=doc))["svg"]
+        assert second != first
+        assert count_elements(second, "circle") == 1
+
+    def test_response_json_is_compact(self, doc):
+        raw = server.add_text(doc_id=doc, text="héllo", x=0, y=0)
+        assert raw.startswith('{"status":"ok",')
+        assert "héllo" in server.get_svg_string(doc_id=doc)
+
     def test_get_svg_string_unknown_errors(self):
         err(server.get_svg_string(doc_id="nope"))
 
     def test_get_svg_preview_returns_list(self, doc):
-        result = server.get_svg_preview(doc_id=doc)
-        assert isinstance(result, list)
-        assert len(result) == 2
-        # First item is JSON status string
-        status = json.loads(result[0])
-        assert status["status"] == "ok"
+        status, (image,) = ok_list(server.get_svg_preview(doc_id=doc))
         assert "width" in status
-        # Second item is an Image object with SVG mime type
+        # Payload is an Image object with PNG mime type
         from mcp.server.fastmcp.utilities.types import Image
-        assert isinstance(result[1], Image)
-        img_content = result[1].to_image_content()
+        assert isinstance(image, Image)
+        img_content = image.to_image_content()
         assert img_content.mimeType == "image/png"
 
     def test_get_svg_preview_unknown_errors(self):
         result = server.get_svg_preview(doc_id="nope")
-        data = json.loads(result)
+        data = _loads(result)
         assert data["status"] == "error"
 
     def test_save_file(self, doc, tmp_path):
-        path = str(tmp_path / "out.svg")
-        result = ok(server.save_file(doc_id=doc, filepath=path))
-        assert result["filepath"] == path
-        content = open(path).read()
-        assert "<svg" in content
+        path = tmp_path / "out.svg"
+        result = ok(server.save_file(doc_id=doc, filepath=str(path)))
+        assert result["filepath"] == str(path)
+        assert b"<svg" in path.read_bytes()
+
+    def test_save_file_overwrites(self, doc, tmp_path):
+        path = tmp_path / "out.svg"
+        path.write_text("x" * 10_000)
+        ok(server.save_file(doc_id=doc, filepath=str(path)))
+        content = path.read_text()
+        assert content.startswith("<?xml") and content.endswith("</svg>")
+
+    def test_save_file_missing_parent_dir_errors(self, doc, tmp_path):
+        path = tmp_path / "nested" / "out.svg"
+        result = err(server.save_file(doc_id=doc, filepath=str(path)))
+        assert result["message"].startswith("File error:")
+        assert not path.parent.exists()
+
+    @pytest.mark.skipif(os.name != "posix", reason="POSIX file modes")
+    def test_save_file_mode_follows_umask(self, doc, tmp_path, monkeypatch):
+        old_umask = os.umask(0o002)
+        try:
+            ok(server.save_file(doc_id=doc, filepath=str(tmp_path / "direct.svg")))
+            monkeypatch.setattr(server, "_DIRECT_WRITE_LIMIT", 0)
+            ok(server.save_file(doc_id=doc, filepath=str(tmp_path / "buffered.svg")))
+        finally:
+            os.umask(old_umask)
+        for name in ("direct.svg", "buffered.svg"):
+            assert (tmp_path / name).stat().st_mode & 0o777 == 0o664, name
+
+    def test_save_file_pretty(self, doc, tmp_path):
+        server.add_circle(doc_id=doc, cx=50, cy=50, r=20)
+        path = tmp_path / "pretty.svg"
+        ok(server.save_file(doc_id=doc, filepath=str(path), pretty=True))
+        content = path.read_text()
+        assert count_elements(content[content.index("<svg"):], "circle") == 1
 
     def test_save_file_unknown_doc_errors(self, tmp_path):
         err(server.save_file(doc_id="ghost", filepath=str(tmp_path / "x.svg")))
@@ -143,59 +317,65 @@ class TestDocuments:
 # ---------------------------------------------------------------------------
 
 
+# (tool, kwargs, tag) for shapes whose only assertion is "one element added".
+SHAPE_CASES = (
+    (server.add_circle, {"cx": 50, "cy": 50, "r": 20}, "circle"),
+    (server.add_rect, {"x": 10, "y": 10, "width": 80, "height": 60}, "rect"),
+    (server.add_line, {"x1": 0, "y1": 0, "x2": 100, "y2": 100}, "line"),
+    (server.add_ellipse, {"cx": 100, "cy": 100, "rx": 50, "ry": 30}, "ellipse"),
+    (server.add_polygon, {"points": [[0, 0], [100, 0], [50, 100]]}, "polygon"),
+    (server.add_path, {"d": "M 10 10 L 100 10 Z"}, "path"),
+)
+
+
 class TestShapes:
-    def test_add_circle(self, doc):
-        result = ok(server.add_circle(doc_id=doc, cx=50, cy=50, r=20))
-        assert result["element_id"].startswith("circle_")
-        svg = ok(server.get_svg_string(doc_id=doc))["svg"]
-        assert count_elements(svg, "circle") == 1
+    def test_add_shapes(self, doc):
+        # All simple shapes share one document so it is serialized once.
+        for adder, kwargs, tag in SHAPE_CASES:
+            result = ok(adder(doc_id=doc, **kwargs))
+            assert result["element_id"].startswith(f"{tag}_")
+        svg = get_svg(doc)
+        for _, _, tag in SHAPE_CASES:
+            assert count_elements(svg, tag) == 1, tag
+
+    def test_coordinates_are_trimmed(self, doc):
+        ok(server.add_circle(doc_id=doc, cx=1 / 3, cy=50.0, r=300.0000000001))
+        circle = parse_svg(get_svg(doc)).find("svg:circle", NS)
+        assert circle.get("cx") == "0.333"
+        assert circle.get("cy") == "50"
+        assert circle.get("r") == "300"
+
+    def test_attribute_values_are_escaped(self, doc):
+        ok(server.add_rect(doc_id=doc, x=0, y=0, width=1, height=1, fill='a"<&b'))
+        rect = parse_svg(get_svg(doc)).find("svg:rect", NS)
+        assert rect.get("fill") == 'a"<&b'
 
     def test_add_circle_unknown_doc_errors(self):
         err(server.add_circle(doc_id="nope", cx=0, cy=0, r=5))
 
-    def test_add_rect(self, doc):
-        result = ok(server.add_rect(doc_id=doc, x=10, y=10, width=80, height=60))
-        assert result["element_id"].startswith("rect_")
-        svg = ok(server.get_svg_string(doc_id=doc))["svg"]
-        assert count_elements(svg, "rect") == 1
+    def test_element_ids_are_unique(self, doc):
+        ids = {
+            ok(server.add_circle(doc_id=doc, cx=0, cy=0, r=1))["element_id"]
+            for _ in range(50)
+        }
+        assert len(ids) == 50
 
     def test_add_rect_with_rounded_corners(self, doc):
         ok(server.add_rect(doc_id=doc, x=0, y=0, width=100, height=100, rx=10, ry=10))
-        svg = ok(server.get_svg_string(doc_id=doc))["svg"]
+        svg = get_svg(doc)
         assert 'rx="10"' in svg
 
-    def test_add_line(self, doc):
-        result = ok(server.add_line(doc_id=doc, x1=0, y1=0, x2=100, y2=100))
-        assert result["element_id"].startswith("line_")
-        svg = ok(server.get_svg_string(doc_id=doc))["svg"]
-        assert count_elements(svg, "line") == 1
-
-    def test_add_ellipse(self, doc):
-        ok(server.add_ellipse(doc_id=doc, cx=100, cy=100, rx=50, ry=30))
-        svg = ok(server.get_svg_string(doc_id=doc))["svg"]
-        assert count_elements(svg, "ellipse") == 1
-
     def test_add_text(self, doc):
         result = ok(server.add_text(doc_id=doc, text="Hello", x=10, y=20))
         assert result["element_id"].startswith("text_")
-        svg = ok(server.get_svg_string(doc_id=doc))["svg"]
+        svg = get_svg(doc)
         assert "Hello" in svg
 
-    def test_add_polygon(self, doc):
-        ok(server.add_polygon(doc_id=doc, points=[[0, 0], [100, 0], [50, 100]]))
-        svg = ok(server.get_svg_string(doc_id=doc))["svg"]
-        assert count_elements(svg, "polygon") == 1
-
-    def test_add_path(self, doc):
-        ok(server.add_path(doc_id=doc, d="M 10 10 L 100 10 Z"))
-        svg = ok(server.get_svg_string(doc_id=doc))["svg"]
-        assert count_elements(svg, "path") == 1
-
     def test_multiple_shapes(self, doc):
         server.add_circle(doc_id=doc, cx=50, cy=50, r=10)
         server.add_circle(doc_id=doc, cx=100, cy=100, r=20)
         server.add_rect(doc_id=doc, x=0, y=0, width=50, height=50)
-        svg = ok(server.get_svg_string(doc_id=doc))["svg"]
+        svg = get_svg(doc)
         assert count_elements(svg, "circle") == 2
         assert count_elements(svg, "rect") == 1
 
@@ -228,10 +408,15 @@ class TestGroups:
         result = ok(server.list_groups(doc_id=doc))
         assert "g1" in result["groups"] and "g2" in result["groups"]
 
+    def test_list_groups_tracks_changes(self, doc):
+        assert ok(server.list_groups(doc_id=doc))["groups"] == []
+        server.create_group(doc_id=doc, group_id="g1")
+        assert ok(server.list_groups(doc_id=doc))["groups"] == ["g1"]
+
     def test_add_shape_to_group(self, doc):
         server.create_group(doc_id=doc, group_id="mygroup")
         ok(server.add_circle(doc_id=doc, cx=50, cy=50, r=10, group_id="mygroup"))
-        svg = ok(server.get_svg_string(doc_id=doc))["svg"]
+        svg = get_svg(doc)
         assert count_elements(svg, "circle") == 1
 
     def test_add_to_unknown_group_errors(self, doc):
@@ -239,7 +424,7 @@ class TestGroups:
 
     def test_group_in_svg_output(self, doc):
         server.create_group(doc_id=doc, group_id="g1")
-        svg = ok(server.get_svg_string(doc_id=doc))["svg"]
+        svg = get_svg(doc)
         assert 'id="g1"' in svg
 
 
@@ -268,7 +453,7 @@ class TestGradients:
         server.add_linear_gradient(
             doc_id=doc, stops=[["0%", "red"], ["100%", "blue"]], gradient_id="g1"
         )
-        svg = ok(server.get_svg_string(doc_id=doc))["svg"]
+        svg = get_svg(doc)
         assert "linearGradient" in svg
 
     def test_add_radial_gradient(self, doc):
@@ -283,6 +468,13 @@ class TestGradients:
         server.add_linear_gradient(doc_id=doc, stops=[["0%", "red"]], gradient_id="g1")
         err(server.add_linear_gradient(doc_id=doc, stops=[["0%", "blue"]], gradient_id="g1"))
 
+    def test_gradient_ids_reset_with_document(self):
+        server.create_document(doc_id="d")
+        ok(server.add_linear_gradient(doc_id="d", stops=[["0%", "red"]], gradient_id="g1"))
+        ok(server.delete_document(doc_id="d"))
+        server.create_document(doc_id="d")
+        ok(server.add_linear_gradient(doc_id="d", stops=[["0%", "red"]], gradient_id="g1"))
+
     def test_list_gradients(self, doc):
         server.add_linear_gradient(doc_id=doc, stops=[["0%", "red"]], gradient_id="g1")
         server.add_radial_gradient(doc_id=doc, stops=[["0%", "blue"]], gradient_id="r1")
@@ -297,7 +489,7 @@ class TestGradients:
         ok(server.add_rect(
             doc_id=doc, x=0, y=0, width=400, height=300, fill=grad["url_ref"]
         ))
-        svg = ok(server.get_svg_string(doc_id=doc))["svg"]
+        svg = get_svg(doc)
         assert "url(#sky)" in svg
 
 
@@ -309,20 +501,38 @@ class TestGradients:
 class TestPatterns:
     def test_add_grid_pattern(self, doc):
         ok(server.add_grid_pattern(doc_id=doc, cell_size=50.0))
-        svg = ok(server.get_svg_string(doc_id=doc))["svg"]
-        # 400px wide / 50 = 8+1 vertical lines; 300px tall / 50 = 6+1 horizontal = 17 total
-        assert count_elements(svg, "line") >= 10
+        svg = get_svg(doc)
+        assert count_elements(svg, "path") == 1
+        # 400px wide / 50 = 8+1 vertical lines; 300px tall / 50 = 6+1 horizontal = 16 total
+        d = parse_svg(svg).find(".//svg:path", NS).get("d")
+        assert d.count("V") == 9
+        assert d.count("H") == 7
 
     def test_add_checkerboard_pattern(self, doc):
         result = ok(server.add_checkerboard_pattern(doc_id=doc, cell_size=100.0))
         assert result["cols"] >= 4
         assert result["rows"] >= 3
-        svg = ok(server.get_svg_string(doc_id=doc))["svg"]
+        svg = get_svg(doc)
         assert count_elements(svg, "rect") >= 1
 
+    def test_checkerboard_alternates_colors(self, doc):
+        ok(server.add_checkerboard_pattern(
+            doc_id=doc, cell_size=100.0, color1="red", color2="blue", tiled=False
+        ))
+        root = parse_svg(get_svg(doc))
+        fills = {}
+        for grp in root.findall("svg:g", NS):
+            for rect in grp.findall("svg:rect", NS):
+                fills[(float(rect.get("x")), float(rect.get("y")))] = grp.get("fill")
+        assert len(fills) == 5 * 4
+        assert fills[(0.0, 0.0)] == "red"
+        assert fills[(100.0, 0.0)] == "blue"
+        assert fills[(0.0, 100.0)] == "blue"
+        assert fills[(100.0, 100.0)] == "red"
+
     def test_add_dot_grid_pattern(self, doc):
         ok(server.add_dot_grid_pattern(doc_id=doc, spacing=50.0, dot_radius=3.0))
-        svg = ok(server.get_svg_string(doc_id=doc))["svg"]
+        svg = get_svg(doc)
         assert count_elements(svg, "circle") >= 1
 
     def test_add_concentric_circles_pattern(self, doc):
@@ -331,21 +541,130 @@ class TestPatterns:
             min_radius=10, max_radius=100, step=10,
         ))
         assert result["circles_added"] == 10
-        svg = ok(server.get_svg_string(doc_id=doc))["svg"]
+        svg = get_svg(doc)
         assert count_elements(svg, "circle") == 10
 
+    def test_concentric_circles_inherit_style(self, doc):
+        ok(server.add_concentric_circles_pattern(
+            doc_id=doc, cx=0, cy=0, max_radius=30, stroke="red", stroke_width=2,
+        ))
+        grp = parse_svg(get_svg(doc)).find("svg:g", NS)
+        assert (grp.get("stroke"), grp.get("stroke-width")) == ("red", "2")
+        circles = grp.findall("svg:circle", NS)
+        assert len(circles) == 3
+        assert all(c.get("stroke") is None for c in circles)
+
+    def test_concentric_circles_fractional_step(self, doc):
+        result = ok(server.add_concentric_circles_pattern(
+            doc_id=doc, cx=0, cy=0, min_radius=0.1, max_radius=1.0, step=0.1,
+        ))
+        assert result["circles_added"] == 10
+
+    def test_non_positive_step_errors(self, doc):
+        err(server.add_grid_pattern(doc_id=doc, cell_size=0))
+        err(server.add_concentric_circles_pattern(doc_id=doc, cx=0, cy=0, step=-1))
+        err(server.add_grid_pattern(doc_id=doc, width=float("inf")))
+        err(server.add_grid_pattern(doc_id=doc, cell_size=float("inf")))
+        err(server.add_dot_grid_pattern(doc_id=doc, height=float("nan")))
+        err(server.add_concentric_circles_pattern(
+            doc_id=doc, cx=0, cy=0, max_radius=float("inf")
+        ))
+        err(server.add_checkerboard_pattern(doc_id=doc, cell_size=0))
+        err(server.add_checkerboard_pattern(doc_id=doc, cell_size=-20))
+        err(server.add_checkerboard_pattern(doc_id=doc, cell_size=-20, tiled=False))
+        err(server.add_checkerboard_pattern(doc_id=doc, width=float("inf")))
+        err(server.add_checkerboard_pattern(doc_id=doc, cell_size=float("inf")))
+        assert server._defs_parts[doc] == []
+        assert count_elements(get_svg(doc), "rect") == 0
+
+    def test_invalid_dot_spacing_adds_no_tile(self, doc):
+        err(server.add_dot_grid_pattern(doc_id=doc, spacing=0, dot_radius=0))
+        err(server.add_dot_grid_pattern(doc_id=doc, spacing=-10, dot_radius=1))
+        assert server._defs_parts[doc] == []
+
     def test_pattern_in_group(self, doc):
         server.create_group(doc_id=doc, group_id="pg")
         ok(server.add_grid_pattern(doc_id=doc, cell_size=50.0, group_id="pg"))
-        svg = ok(server.get_svg_string(doc_id=doc))["svg"]
-        assert count_elements(svg, "line") >= 1
+        svg = get_svg(doc)
+        assert len(parse_svg(svg).findall("svg:g/svg:path", NS)) == 1
+
+    def test_pattern_fragment_shared_across_documents(self, doc):
+        other = ok(server.create_document(width="400px", height="300px"))["doc_id"]
+        first = ok(server.add_dot_grid_pattern(doc_id=doc, spacing=50.0))
+        second = ok(server.add_dot_grid_pattern(doc_id=other, spacing=50.0))
+        (body,) = server._tile_ids[doc]
+        assert next(iter(server._tile_ids[other])) is body
+        assert server._defs_parts[doc] == [f'<pattern id="{first["pattern_id"]}"{body}']
+        assert server._defs_parts[other][0].startswith(
+            f'<pattern id="{second["pattern_id"]}"'
+        )
+
+    def test_distinct_tiles_get_distinct_patterns(self, doc):
+        first = ok(server.add_dot_grid_pattern(
+            doc_id=doc, spacing=21.0, dot_radius=8.2, fill="#cccccc"
+        ))
+        second = ok(server.add_dot_grid_pattern(
+            doc_id=doc, spacing=33.0, dot_radius=0.9, fill="white"
+        ))
+        assert first["pattern_id"] != second["pattern_id"]
+        patterns = parse_svg(get_svg(doc)).findall("svg:defs/svg:pattern", NS)
+        assert [p.get("id") for p in patterns] == [
+            first["pattern_id"], second["pattern_id"]
+        ]
+        assert [p.get("width") for p in patterns] == ["21", "33"]
+
+    def test_tile_ids_do_not_clash_with_gradients(self, doc):
+        pid = ok(server.add_dot_grid_pattern(doc_id=doc, spacing=50.0))["pattern_id"]
+        err(server.add_linear_gradient(
+            doc_id=doc, stops=[["0%", "red"]], gradient_id=pid
+        ))
+
+    def test_tile_id_skips_existing_gradient_id(self, doc, monkeypatch):
+        ok(server.add_linear_gradient(
+            doc_id=doc, stops=[["0%", "red"]], gradient_id="dots_a"
+        ))
+        ids = iter(["dots_a", "dots_b"])
+        monkeypatch.setattr(server, "_new_id", lambda prefix="": next(ids))
+        result = ok(server.add_dot_grid_pattern(doc_id=doc, spacing=50.0))
+        assert result["pattern_id"] == "dots_b"
+
+    def test_checkerboard_tiled_uses_pattern(self, doc):
+        result = ok(server.add_checkerboard_pattern(doc_id=doc, cell_size=100.0))
+        ok(server.add_checkerboard_pattern(doc_id=doc, cell_size=100.0))
+        root = parse_svg(get_svg(doc))
+        patterns = root.findall("svg:defs/svg:pattern", NS)
+        assert [p.get("id") for p in patterns] == [result["pattern_id"]]
+        fills = [r.get("fill") for r in root.findall("svg:rect", NS)]
+        assert fills == [f"url(#{result['pattern_id']})"] * 2
+
+    def test_dot_grid_tiled_geometry(self, doc):
+        result = ok(server.add_dot_grid_pattern(doc_id=doc, spacing=50.0))
+        root = parse_svg(get_svg(doc))
+        pattern = root.find("svg:defs/svg:pattern", NS)
+        assert pattern.get("id") == result["pattern_id"]
+        assert (pattern.get("x"), pattern.get("y")) == ("25", "25")
+        assert (pattern.get("width"), pattern.get("height")) == ("50", "50")
+        # Dots at 50..400 x 50..300 on a 400x300 document: 8 cols, 6 rows.
+        rect = root.find("svg:rect", NS)
+        assert rect.get("fill") == f"url(#{result['pattern_id']})"
+        assert (rect.get("x"), rect.get("y")) == ("25", "25")
+        assert (rect.get("width"), rect.get("height")) == ("400", "300")
+
+    def test_dot_grid_untiled(self, doc):
+        ok(server.add_dot_grid_pattern(
+            doc_id=doc, spacing=100.0, dot_radius=3.0, tiled=False
+        ))
+        svg = get_svg(doc)
+        assert count_elements(svg, "circle") == 4 * 3
+        assert count_elements(svg, "pattern") == 0
 
     def test_grid_with_explicit_dimensions(self, doc):
         ok(server.add_grid_pattern(
             doc_id=doc, cell_size=50.0, width=200.0, height=200.0
         ))
-        svg = ok(server.get_svg_string(doc_id=doc))["svg"]
-        assert count_elements(svg, "line") >= 8
+        svg = get_svg(doc)
+        d = parse_svg(svg).find(".//svg:path", NS).get("d")
+        assert d.count("M") == 10
 
 
 # ---------------------------------------------------------------------------
@@ -377,3 +696,34 @@ class TestErrors:
         err(server.add_checkerboard_pattern(doc_id="missing"))
         err(server.add_dot_grid_pattern(doc_id="missing"))
         err(server.add_concentric_circles_pattern(doc_id="missing", cx=0, cy=0))
+
+
+# ---------------------------------------------------------------------------
+# TestHelpers
+# ---------------------------------------------------------------------------
+
+
+class TestHelpers:
+    def test_parse_size(self):
+        assert server._parse_size("800px") == 800.0
+        assert server._parse_size(" 12.5px ") == 12.5
+        assert server._parse_size(".5px") == 0.5
+        assert server._parse_size("100%") == 100.0
+
+    def test_per_element_fragments_are_not_cached(self):
+        # Their size scales with the cell count and must not outlive documents.
+        for builder in (
+            server._grid_frag,
+            server._checkerboard_frag,
+            server._dot_grid_frag,
+            server._concentric_frag,
+        ):
+            assert not hasattr(builder, "cache_info"), builder.__name__
+
+    def test_parse_size_matches_leading_digits_only(self):
+        # The 'px' fast path must agree with the [\d.]+ prefix match.
+        assert server._parse_size("1e3px") == 1.0
+        assert server._parse_size("+5px") == 800.0
+        assert server._parse_size("-5px") == 800.0
+        assert server._parse_size("nanpx") == 800.0
+        assert server._parse_size("infpx") == 800.0